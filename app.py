@@ -1,29 +1,68 @@
-import typer
+import sys
+import logging
+from typing import TYPE_CHECKING
 
-app = typer.Typer(
-    help="Connect USB drive on the CAN Switcher to the PC or to the ECU.",
-    no_args_is_help=True
-)
+if TYPE_CHECKING:
+    import typer
 
-@app.command()
-def connect(target: str = typer.Argument(..., help="Target to connect to: 'pc' or 'ecu'")):
+
+# name of the UsbSwitcher method that connects the USB drive to the respective target
+TARGET_TO_METHOD = {
+    "pc": "connect_peripheral_to_pi",
+    "ecu": "connect_peripheral_to_external",
+}
+
+
+def connect_to(method: str) -> None:
+    """Connects the USB drive using the given UsbSwitcher method.
+
+    Args:
+        method: Name of the UsbSwitcher method, see TARGET_TO_METHOD.
     """
-    Connect the USB drive to the specified target.
+    from usb_switcher import UsbSwitcher
+
+    getattr(UsbSwitcher(), method)()
+
+
+def create_app() -> "typer.Typer":
+    """Builds the typer application. typer is imported here as it is only needed when the
+    arguments are not handled by the fast path below.
+
+    Returns:
+        The CLI application.
     """
-    target = target.lower()
-    if target == "pc":
-        """Connect the USB drive to the Pi."""
-        from usb_switcher import UsbSwitcher
+    import typer
+
+    app = typer.Typer(
+        help="Connect USB drive on the CAN Switcher to the PC or to the ECU.",
+        no_args_is_help=True
+    )
+
+    @app.command()
+    def connect(target: str = typer.Argument(..., help="Target to connect to: 'pc' or 'ecu'")):
+        """
+        Connect the USB drive to the specified target.
+        """
+        method = TARGET_TO_METHOD.get(target.lower())
+        if method is None:
+            typer.echo("Invalid target. Please choose 'pc' or 'ecu'.", err=True)
+            raise typer.Exit(code=1)
 
-        UsbSwitcher().connect_peripheral_to_pi()
-    elif target == "ecu":
-        """Connect the USB drive to the ECU."""
-        from usb_switcher import UsbSwitcher
+        connect_to(method)
+
+    return app
 
-        UsbSwitcher().connect_peripheral_to_external()
-    else:
-        typer.echo("Invalid target. Please choose 'pc' or 'ecu'.", err=True)
-        raise typer.Exit(code=1)
 
 if __name__ == "__main__":
-    app()
+    # configure globally
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(levelname)s in %(module)s: %(message)s'
+    )
+
+    # fast path for "app.py pc" / "app.py ecu", skips loading typer and its dependencies
+    if len(sys.argv) == 2 and (method := TARGET_TO_METHOD.get(sys.argv[1].lower())):
+        connect_to(method)
+        sys.exit(0)
+
+    create_app()()
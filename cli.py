@@ -12,4 +12,4 @@ class Action(str, Enum):
         Returns:
             True if the value is "on", False otherwise.
         """
-        return self.value == "on"
+        return self is Action.on
@@ -1,10 +1,13 @@
 import os
 from typing import TYPE_CHECKING
+from functools import cached_property
 
 if TYPE_CHECKING:
     from types import TracebackType
     from typing import Type
 
+HAT_DIRECTORY = "/proc/device-tree/hat/"
+
 class MissingPrecondition(Exception):
     def __init__(self, description=None, suggested_fix=None):
         self.description = description
@@ -20,11 +23,16 @@ class IdEeprom:
     Attributes:
             log: Logger object.
             eeprom_size: Size of the attached EEPROM in kbit.
-            board_info: Dictionary with information from /proc/device-tree/hat/ folder.
+            board_info: Dictionary with the raw lines (bytes) of the entries in
+                /proc/device-tree/hat/ folder.
             manufacturer_data: Project specific custom data.
             version: Decoded hardware version of the board.
     """
 
+    # decoded HAT content shared by all instances, stored as
+    # (mtime_ns, board_info, manufacturer_data, version)
+    _cache: "tuple[int, dict, dict, str | None] | None" = None
+
     def __init__(self, eeprom_size: int = 32) -> None:
         """Constructor of the class initialises the ID EEPROM and searches for
         available content on the Pi in path /proc/device-tree/hat/ and reads
@@ -40,30 +48,22 @@ class IdEeprom:
 
         # check content
         try:
-            content = os.listdir("/proc/device-tree/hat/")
+            mtime_ns = os.stat(HAT_DIRECTORY).st_mtime_ns
         except FileNotFoundError as exception:
             raise MissingPrecondition(
                 description="CAN switcher is unavailable - no HAT information found",
                 suggested_fix="add the missing CAN switcher",
             ) from exception
 
-        for entry in content:
-            with open(f"/proc/device-tree/hat/{entry}", encoding="utf-8") as file:
-                if entry == "custom_0":
-                    custom_info_lines = []
-                    for line in file:
-                        if len(line) < 2 or line[-1] != "\n":
-                            raise FrameworkError(
-                                f"Invalid board info: malformed line {repr(line)},"
-                                f" expecting newline-terminated, non-empty string"
-                            )
-                        custom_info_lines.append(line[:-1])
-                    self.board_info[entry] = custom_info_lines
-                else:
-                    # read every line of the entry and save them to a list
-                    self.board_info[entry] = [
-                        stripped_line for line in file if (stripped_line := line.strip())
-                    ]
+        # the HAT content is static while the board is attached, reuse the decoded data
+        cache = IdEeprom._cache
+        if cache is not None and cache[0] == mtime_ns:
+            self.board_info = dict(cache[1])
+            self.manufacturer_data = dict(cache[2])
+            self.version = cache[3]
+            return
+
+        self._read_board_info()
 
         # always decode the custom data
         self.decode_manufacturer_custom_data()
@@ -71,6 +71,69 @@ class IdEeprom:
         # extract the board version
         self.decode_board_version()
 
+        IdEeprom._cache = (
+            mtime_ns, dict(self.board_info), dict(self.manufacturer_data), self.version
+        )
+
+    def _read_board_info(self) -> None:
+        """Reads every entry of the HAT directory into board_info."""
+        # open the entries relative to the directory instead of resolving the full path each time
+        dir_fd = os.open(HAT_DIRECTORY, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            with os.scandir(dir_fd) as entries:
+                contents = {
+                    entry.name: self._read_entry(entry.name, dir_fd)
+                    for entry in entries
+                    if entry.is_file()
+                }
+        finally:
+            os.close(dir_fd)
+
+        for entry, content in contents.items():
+            if entry == "custom_0":
+                if not content:
+                    self.board_info[entry] = []
+                    continue
+
+                # every line has to be newline-terminated and non-empty
+                if not content.endswith(b"\n"):
+                    raise FrameworkError(
+                        f"Invalid board info: malformed content {repr(content)},"
+                        f" expecting newline-terminated lines"
+                    )
+                custom_info_lines = content[:-1].split(b"\n")
+                if b"" in custom_info_lines:
+                    raise FrameworkError(
+                        f"Invalid board info: malformed content {repr(content)},"
+                        f" expecting non-empty lines"
+                    )
+                self.board_info[entry] = custom_info_lines
+            else:
+                # save every non-empty line of the entry to a list
+                self.board_info[entry] = [
+                    stripped_line
+                    for line in content.splitlines()
+                    if (stripped_line := line.strip())
+                ]
+
+    def _read_entry(self, name: str, dir_fd: int) -> bytes:
+        """Reads an entry of the HAT directory with a single read, as the entries are tiny and
+        can't be larger than the EEPROM.
+
+        Args:
+            name: Name of the entry.
+            dir_fd: File descriptor of the HAT directory.
+
+        Returns:
+            Content of the entry.
+        """
+        fd = os.open(name, os.O_RDONLY, dir_fd=dir_fd)
+        try:
+            # EEPROM size is given in kbit
+            return os.read(fd, self.eeprom_size * 128)
+        finally:
+            os.close(fd)
+
     def __enter__(self) -> object:
         """Context Manager initialisation.
 
@@ -87,6 +150,14 @@ class IdEeprom:
     ) -> None:
         """Context Manager cleanup."""
 
+    @cached_property
+    def board_info_str(self) -> dict[str, list[str]]:
+        """Returns board_info with every line decoded to a string."""
+        return {
+            entry: [line.decode("utf-8", errors="replace") for line in lines]
+            for entry, lines in self.board_info.items()
+        }
+
     def decode_manufacturer_custom_data(self) -> dict:
         """Decodes the project specific manufacturer custom data of an ID EEPROM. The data has to
         be stored as a key-value pair and must be separated with a LF character, e.g. "date\n" and
@@ -105,7 +176,7 @@ class IdEeprom:
         for idx, item in enumerate(self.board_info["custom_0"]):
             if not idx % 2:
                 # store key
-                key = item
+                key = item.decode("utf-8", errors="replace")
             else:
                 # add key and value to dictionary
                 data[key] = item
@@ -114,15 +185,16 @@ class IdEeprom:
         for key, value in data.items():
             # check value
             if key == "serial_number":
-                data[key] = bytes(value, "latin-1").hex().replace("2d", "-")
+                # hex encode the binary parts, keeping the "-" separators
+                data[key] = "-".join(part.hex() for part in value.split(b"-"))
 
             # number values
             elif len(value) == 1:
-                data[key] = int(bytes(value, "latin-1").hex(), 16)
+                data[key] = value[0]
 
             # string values
             else:
-                data[key] = value
+                data[key] = value.decode("utf-8", errors="replace")
 
         self.manufacturer_data = data
 
@@ -130,7 +202,8 @@ class IdEeprom:
 
     def decode_board_version(self) -> str:
         # extract the board version to get a string like "0.1"
-        self.version = self.board_info["product_ver"][0]
-        self.version = self.version.split("x")[1][1:2] + "." + self.version.split("x")[1][2:3]
+        product_ver = self.board_info["product_ver"][0].decode("utf-8", errors="replace")
+        _, _, digits = product_ver.partition("x")
+        self.version = f"{digits[1:2]}.{digits[2:3]}"
 
         return self.version
@@ -1,3 +1,6 @@
+import os
+import time
+import random
 import logging
 import tempfile
 from abc import (
@@ -5,6 +8,7 @@ from abc import (
     abstractmethod,
 )
 from enum import Enum
+from functools import lru_cache
 from typing import TYPE_CHECKING
 from pathlib import Path
 from contextlib import (
@@ -13,14 +17,23 @@ from contextlib import (
     contextmanager,
 )
 
-import typer
-from filelock import FileLock
+from filelock import (
+    Timeout,
+    FileLock,
+)
 
 if TYPE_CHECKING:
     from typing import Any
-    from collections.abc import Generator
+    from collections.abc import (
+        Callable,
+        Generator,
+    )
 
-logging.getLogger("filelock").disabled = True
+# silence filelock completely, records are dropped at the level check instead of being dispatched
+_filelock_logger = logging.getLogger("filelock")
+_filelock_logger.setLevel(logging.CRITICAL + 1)
+_filelock_logger.propagate = False
+_filelock_logger.addHandler(logging.NullHandler())
 
 
 class TerminationAfterInitialFailure(Exception):
@@ -57,6 +70,9 @@ class CLIResourceCallbackHandler(ResourceLockCallbackHandler):
         return False
 
     def initial_failure(self) -> None:
+        # imported here, as typer is slow to import and this is its only user in the module
+        import typer
+
         typer.echo(
             f"Another instance of the framework is already using the "
             f"{typer.style(self.resource_lock.name, bold=True)} resource, waiting for the "
@@ -75,10 +91,21 @@ class _ResourceLock(FileLock):
     Attributes:
         DEFAULT_PARENT_DIRECTORY: Default parent directory for all lock files.
         EXTENSION: Generated lock extension.
+        RELEASE_EXTENSION: Extension of the file touched whenever the lock gets released.
+        BACKOFF_BASE: Initial interval between attempts to acquire the lock in seconds.
+        BACKOFF_CAP: Maximum interval between attempts to acquire the lock in seconds.
     """
 
-    DEFAULT_PARENT_DIRECTORY = Path(tempfile.gettempdir(), "krake")
+    # prefer the RAM-backed /dev/shm, as /tmp may be disk-backed
+    DEFAULT_PARENT_DIRECTORY = (
+        Path("/dev/shm", "krake")
+        if Path("/dev/shm").is_dir()
+        else Path(tempfile.gettempdir(), "krake")
+    )
     EXTENSION = ".lock"
+    RELEASE_EXTENSION = ".released"
+    BACKOFF_BASE = 0.02
+    BACKOFF_CAP = 1.0
 
     def __init__(self, name: str, parent_directory: Path | None = None) -> None:
         """Initialises the process lock.
@@ -92,8 +119,10 @@ class _ResourceLock(FileLock):
         directory = parent_directory or self.DEFAULT_PARENT_DIRECTORY
         directory.mkdir(parents=True, exist_ok=True)
         with suppress(PermissionError):
-            directory.chmod(0o777)
+            if directory.stat().st_mode & 0o777 != 0o777:
+                directory.chmod(0o777)
         self.lock_file_path = directory.joinpath(f"{name}{self.EXTENSION}")
+        self.release_signal_path = directory.joinpath(f"{name}{self.RELEASE_EXTENSION}")
         super().__init__(str(self.lock_file_path), mode=0o666)
         self.__initial_failure_to_acquire_handled = False
 
@@ -101,6 +130,11 @@ class _ResourceLock(FileLock):
         """Custom version that executes callback functions depending on whether the initial attempt
         to acquire the lock failed.
 
+        Notes:
+            Unless positional arguments or an explicit polling/blocking behaviour are passed, the
+            lock is polled with an exponential backoff with jitter instead of the fixed interval
+            of the original method, so multiple waiters don't retry in lockstep.
+
         Args:
             *args: Positional arguments passed to the original method.
             **kwargs: Positional arguments passed to the original method.
@@ -109,11 +143,172 @@ class _ResourceLock(FileLock):
             The original return value.
         """
         self.__initial_failure_to_acquire_handled = False
-        acquire_proxy = super().acquire(*args, **kwargs)
+        if args or kwargs.keys() - {"timeout"}:
+            acquire_proxy = super().acquire(*args, **kwargs)
+        else:
+            acquire_proxy = self._acquire_with_backoff(kwargs.get("timeout"))
         if self.__initial_failure_to_acquire_handled:
             self.callback_handler.success_after_initial_failure()
         return acquire_proxy
 
+    def _acquire_with_backoff(self, timeout: float | None) -> "Any":
+        """Repeats non-blocking attempts to acquire the lock, sleeping for an exponentially growing
+        and randomised interval in between.
+
+        Args:
+            timeout: Maximum time to wait for the lock, a negative value waits forever. Defaults to
+                the timeout of the lock.
+
+        Returns:
+            The original return value of acquire.
+
+        Raises:
+            Timeout: If the lock could not be acquired within the timeout.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        deadline = None if timeout < 0 else time.monotonic() + timeout
+
+        with ExitStack() as exit_stack:
+            wait_for_release = None
+            attempt = 0
+            while True:
+                try:
+                    return super().acquire(blocking=False)
+                except Timeout:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise
+
+                if wait_for_release is None:
+                    # start watching before the next attempt, so a release in between isn't missed
+                    wait_for_release = exit_stack.enter_context(self._release_watcher())
+                    continue
+
+                delay = self.backoff_delay(attempt)
+                if deadline is not None:
+                    delay = max(0.0, min(delay, deadline - time.monotonic()))
+                wait_for_release(delay)
+                attempt += 1
+
+    @contextmanager
+    def shared(self) -> "Generator[None]":
+        """Context manager that holds the lock in shared mode. Any number of shared holders can hold
+        the lock at the same time, while exclusive holders (acquire) are kept out and vice versa.
+
+        Notes:
+            Shared mode is implied if the current instance already holds the lock exclusively.
+            Acquiring the lock exclusively while holding it in shared mode blocks forever, as the
+            two modes use separate file descriptors.
+        """
+        if self.is_locked:
+            yield
+            return
+
+        import fcntl
+
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o666)
+        # the umask applies to a created file, keep it usable for exclusive holders of other users
+        with suppress(PermissionError):
+            os.fchmod(fd, 0o666)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.callback_handler.initial_failure()
+                if self.callback_handler.terminate_after_initial_failure:
+                    raise TerminationAfterInitialFailure from None
+                # wait in the kernel until the exclusive holder releases the lock
+                fcntl.flock(fd, fcntl.LOCK_SH)
+                self.callback_handler.success_after_initial_failure()
+            yield
+        finally:
+            # closing the descriptor releases the lock
+            os.close(fd)
+            self._signal_release()
+
+    def is_held_exclusively(self) -> bool:
+        """Checks without blocking whether the lock is held exclusively, by this instance or by
+        another process.
+
+        Returns:
+            True if a shared holder would have to wait, False otherwise.
+        """
+        if self.is_locked:
+            return True
+
+        import fcntl
+
+        try:
+            fd = os.open(self.lock_file, os.O_RDONLY)
+        except FileNotFoundError:
+            # nobody has used the lock yet
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        finally:
+            # closing the descriptor releases the probing lock
+            os.close(fd)
+        return False
+
+    def acquire_nowait(self) -> bool:
+        """Makes a single non-blocking attempt to acquire the lock without executing the callbacks.
+
+        Returns:
+            True if the lock was acquired, False otherwise.
+        """
+        self.__initial_failure_to_acquire_handled = True
+        try:
+            super().acquire(blocking=False)
+        except Timeout:
+            return False
+        return True
+
+    @classmethod
+    def backoff_delay(cls, attempt: int) -> float:
+        """Calculates the randomised interval to wait before the next attempt to acquire a lock.
+
+        Args:
+            attempt: Number of the failed attempts so far, starting at 0.
+
+        Returns:
+            Interval in seconds.
+        """
+        return min(cls.BACKOFF_CAP, cls.BACKOFF_BASE * 2**attempt) * (0.5 + random.random())
+
+    @contextmanager
+    def _release_watcher(self) -> "Generator[Callable[[float], None]]":
+        """Context manager that yields a function waiting up to the given amount of seconds for the
+        lock to get released.
+
+        Notes:
+            If inotify_simple is installed, the waiting function returns as soon as the holder of
+            the lock signals the release by touching the release signal file. Otherwise it simply
+            sleeps. The backoff interval remains the upper bound in both cases, as a crashed holder
+            releases the lock without signalling it.
+        """
+        try:
+            from inotify_simple import (
+                INotify,
+                flags,
+            )
+        except ImportError:
+            yield time.sleep
+            return
+
+        with INotify() as inotify:
+            inotify.add_watch(self.release_signal_path.parent, flags.CLOSE_WRITE | flags.ATTRIB)
+
+            def wait_for_release(delay: float) -> None:
+                deadline = time.monotonic() + delay
+                while (remaining := deadline - time.monotonic()) > 0:
+                    events = inotify.read(timeout=max(1, int(remaining * 1000)))
+                    if any(event.name == self.release_signal_path.name for event in events):
+                        return
+
+            yield wait_for_release
+
     def _acquire(self) -> None:
         """Overridden version used for calling custom callbacks if the initial attempt to acquire
         the lock is unsuccessful.
@@ -133,9 +328,26 @@ class _ResourceLock(FileLock):
         if self.callback_handler.terminate_after_initial_failure:
             raise TerminationAfterInitialFailure
 
+    def _release(self) -> None:
+        """Overridden version that signals instances waiting for the lock that it got released."""
+        super()._release()
+        self._signal_release()
+
+    def _signal_release(self) -> None:
+        """Touches the release signal file to wake up instances waiting for the lock."""
+        with suppress(OSError):
+            try:
+                self.release_signal_path.touch(mode=0o666, exist_ok=False)
+            except FileExistsError:
+                self.release_signal_path.touch()
+            else:
+                # the umask applies to the created file, the releases of other users touch it too
+                self.release_signal_path.chmod(0o666)
+
 
 class ResourceLock(Enum):
-    """Stores available resource locks.
+    """Stores available resource locks. The file-backed lock of a member is only created once it
+    is requested through get().
 
     Attributes:
         KRAKE: General purpose lock.
@@ -145,17 +357,75 @@ class ResourceLock(Enum):
         LOG_DIRECTORY: Used whenever a new log directory needs to be created.
     """
 
-    KRAKE = _ResourceLock("KRAKE")
-    TARGET_INTERACTION = _ResourceLock("TARGET_INTERACTION")
-    INI = _ResourceLock("INI")
-    CACHE = _ResourceLock("CACHE")
-    LOG_DIRECTORY = _ResourceLock("LOG_DIRECTORY")
+    KRAKE = "KRAKE"
+    TARGET_INTERACTION = "TARGET_INTERACTION"
+    INI = "INI"
+    CACHE = "CACHE"
+    LOG_DIRECTORY = "LOG_DIRECTORY"
+
+    def get(self) -> _ResourceLock:
+        """Returns the file-backed lock of the resource, creating it on first use.
+
+        Returns:
+            The resource lock shared by every caller in the process.
+        """
+        return _get_resource_lock(self.value)
 
     @classmethod
     @contextmanager
     def all_acquired(cls) -> "Generator[None]":
-        """Context manager that acquires every available lock."""
-        with ExitStack() as exit_stack:
-            for lock in cls:
-                exit_stack.enter_context(lock.value)
+        """Context manager that acquires every available lock.
+
+        Notes:
+            The locks are requested in a fixed order (by name) without blocking. If any of them is
+            in use, the already acquired ones are released again before retrying with a backoff,
+            so no lock is held while waiting for another one.
+        """
+        locks = [member.get() for member in sorted(cls, key=lambda member: member.name)]
+        contended_lock = None
+        attempt = 0
+        while True:
+            acquired = []
+            for lock in locks:
+                if not lock.acquire_nowait():
+                    break
+                acquired.append(lock)
+            else:
+                break
+
+            for lock in reversed(acquired):
+                lock.release()
+
+            blocking_lock = locks[len(acquired)]
+            if contended_lock is None:
+                contended_lock = blocking_lock
+                contended_lock.callback_handler.initial_failure()
+                if contended_lock.callback_handler.terminate_after_initial_failure:
+                    raise TerminationAfterInitialFailure
+
+            # pylint: disable=protected-access
+            with blocking_lock._release_watcher() as wait_for_release:
+                wait_for_release(_ResourceLock.backoff_delay(attempt))
+            attempt += 1
+
+        if contended_lock is not None:
+            contended_lock.callback_handler.success_after_initial_failure()
+
+        try:
             yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+
+@lru_cache(maxsize=None)
+def _get_resource_lock(name: str) -> _ResourceLock:
+    """Creates the resource lock with the given name once per process.
+
+    Args:
+        name: Lock name.
+
+    Returns:
+        The resource lock.
+    """
+    return _ResourceLock(name)
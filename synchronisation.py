@@ -2,13 +2,20 @@ from typing import (
     overload,
     TYPE_CHECKING,
 )
+from weakref import (
+    WeakKeyDictionary,
+    WeakValueDictionary,
+)
 from functools import wraps
 
 from process_helper import ResourceLock
 
 if TYPE_CHECKING:
+    from process_helper import _ResourceLock
     from typing import (
+        Any,
         TypeVar,
+        Literal,
         Callable,
         ParamSpec,
         TypeAlias,
@@ -26,13 +33,22 @@ def acquires_lock(wrapped_function: "WrappedCallable") -> "WrappedCallable":
 
 
 @overload
-def acquires_lock(*, lock: ResourceLock = ResourceLock.KRAKE) -> "WrappedCallable":
+def acquires_lock(
+    *,
+    lock: ResourceLock = ResourceLock.KRAKE,
+    mode: 'Literal["r", "w"]' = "w",
+    optimistic: "Callable[[], Any] | None" = None,
+) -> "WrappedCallable":
     """Overload for the version that takes keyword-only arguments."""
     ...
 
 
 def acquires_lock(
-    wrapped_function: "WrappedCallable | None" = None, *, lock: ResourceLock = ResourceLock.KRAKE
+    wrapped_function: "WrappedCallable | None" = None,
+    *,
+    lock: ResourceLock = ResourceLock.KRAKE,
+    mode: 'Literal["r", "w"]' = "w",
+    optimistic: "Callable[[], Any] | None" = None,
 ) -> "WrappedCallable":
     """Decorator for functions that should acquire the resource lock.
 
@@ -41,10 +57,25 @@ def acquires_lock(
             without arguments.
         lock: Enum instance that represents the lock that should be acquired. Must be passed as
             a keyword argument.
+        mode: "w" to hold the lock exclusively, "r" to hold it in shared mode, so functions that
+            only read the resource don't serialise against each other. Must be passed as a keyword
+            argument.
+        optimistic: Optional function returning a cheap snapshot of the guarded resource, e.g. the
+            modification time of a file. If passed, the wrapped function is first executed
+            without the lock and its result is only used if the snapshot is unchanged afterwards
+            and the lock isn't held exclusively, otherwise it is executed again while holding the
+            lock. The same applies if taking a snapshot or the execution without the lock raises
+            an exception. Only suitable for functions that don't modify the resource. Must be
+            passed as a keyword argument.
 
     Returns:
         Modified function with code that acquires the resource lock.
+
+    Raises:
+        ValueError: If mode is neither "r" nor "w".
     """
+    if mode not in ("r", "w"):
+        raise ValueError(f'Invalid lock mode "{mode}", expected "r" or "w"')
 
     def outer(function: "WrappedCallable") -> "WrappedCallable":
         """Outer function used to allow the decorator to take the lock name as an argument.
@@ -55,6 +86,80 @@ def acquires_lock(
         Returns:
             Modified function with code that acquires the resource lock.
         """
+        return _make_wrapper(function, lock, mode, optimistic)
+
+    if wrapped_function is None:
+        return outer
+
+    if not callable(wrapped_function):
+        raise TestImplementationError(
+            "Detected an invalid callable - please make sure only "
+            "keyword arguments are passed to the decorator"
+        )
+    return outer(wrapped_function)
+
+
+# existing wrappers by decorated function and decorator arguments, both levels are weak so
+# neither the functions nor the wrappers are kept alive
+_wrappers: "WeakKeyDictionary[WrappedCallable, WeakValueDictionary[tuple, WrappedCallable]]" = (
+    WeakKeyDictionary()
+)
+
+
+def _make_wrapper(
+    function: "WrappedCallable",
+    lock: ResourceLock,
+    mode: 'Literal["r", "w"]',
+    optimistic: "Callable[[], Any] | None",
+) -> "WrappedCallable":
+    """Returns the wrapper acquiring the resource lock. Decorating the same function with the same
+    arguments again returns the existing wrapper, as long as it is still in use.
+
+    Args:
+        function: Decorated function.
+        lock: Enum instance that represents the lock that should be acquired.
+        mode: "w" to hold the lock exclusively, "r" to hold it in shared mode.
+        optimistic: Optional function returning a cheap snapshot of the guarded resource.
+
+    Returns:
+        Modified function with code that acquires the resource lock.
+    """
+    try:
+        wrappers = _wrappers.setdefault(function, WeakValueDictionary())
+    except TypeError:
+        # the callable doesn't support weak references
+        return _create_wrapper(function, lock, mode, optimistic)
+
+    key = (lock, mode, optimistic)
+    wrapper = wrappers.get(key)
+    if wrapper is None:
+        wrapper = wrappers[key] = _create_wrapper(function, lock, mode, optimistic)
+    return wrapper
+
+
+def _create_wrapper(
+    function: "WrappedCallable",
+    lock: ResourceLock,
+    mode: 'Literal["r", "w"]',
+    optimistic: "Callable[[], Any] | None",
+) -> "WrappedCallable":
+    """Creates the wrapper acquiring the resource lock. The wrapper matching the decorator
+    arguments is selected here, so the calls don't have to.
+
+    Args:
+        function: Decorated function.
+        lock: Enum instance that represents the lock that should be acquired.
+        mode: "w" to hold the lock exclusively, "r" to hold it in shared mode.
+        optimistic: Optional function returning a cheap snapshot of the guarded resource.
+
+    Returns:
+        Modified function with code that acquires the resource lock.
+    """
+    exclusive = mode == "w"
+    # resolved on the first call and kept for the lifetime of the wrapper
+    resource_lock: "_ResourceLock | None" = None
+
+    if optimistic is None:
 
         @wraps(function)
         def inner(*args: "P.args", **kwargs: "P.kwargs") -> "R":
@@ -67,17 +172,43 @@ def acquires_lock(
             Returns:
                 Same return value as the wrapped function.
             """
-            with lock.value:
+            nonlocal resource_lock
+            if resource_lock is None:
+                resource_lock = lock.get()
+
+            with resource_lock if exclusive else resource_lock.shared():
                 return function(*args, **kwargs)
 
         return inner
 
-    if not wrapped_function:
-        return outer
+    @wraps(function)
+    def inner_optimistic(*args: "P.args", **kwargs: "P.kwargs") -> "R":
+        """Inner function that only acquires the resource lock if the resource changed while
+        the wrapped function was executed without it.
 
-    if not callable(wrapped_function):
-        raise TestImplementationError(
-            "Detected an invalid callable - please make sure only "
-            "keyword arguments are passed to the decorator"
-        )
-    return outer(wrapped_function)
+        Args:
+            *args: Positional arguments passed to the wrapped function.
+            **kwargs: Keyword arguments passed to the wrapped function.
+
+        Returns:
+            Same return value as the wrapped function.
+        """
+        nonlocal resource_lock
+        if resource_lock is None:
+            resource_lock = lock.get()
+
+        try:
+            snapshot = optimistic()
+            result = function(*args, **kwargs)
+            # a writer may still be in the middle of an update without having touched the
+            # snapshot yet, so the result is only used if nobody holds the lock exclusively
+            if optimistic() == snapshot and not resource_lock.is_held_exclusively():
+                return result
+        except Exception:  # pylint: disable=broad-except
+            # a failed snapshot or a torn read, the execution while holding the lock decides
+            pass
+
+        with resource_lock if exclusive else resource_lock.shared():
+            return function(*args, **kwargs)
+
+    return inner_optimistic
@@ -0,0 +1,62 @@
+import sys
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+# the modules live in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import eeprom  # noqa: E402
+import fake_smbus2  # noqa: E402
+import usb_switcher  # noqa: E402
+from process_helper import (  # noqa: E402
+    _ResourceLock,
+    _get_resource_lock,
+)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def lock_directory(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Keeps the lock files of the tests apart from the ones of a running framework."""
+    directory = tmp_path_factory.mktemp("locks")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(_ResourceLock, "DEFAULT_PARENT_DIRECTORY", directory)
+        _get_resource_lock.cache_clear()
+        yield directory
+
+
+@pytest.fixture(scope="session")
+def fork_context() -> "multiprocessing.context.ForkContext":
+    """Starts the processes competing for locks. A forked process must create its own locks, as
+    filelock refuses to use inherited ones."""
+    return multiprocessing.get_context("fork")
+
+
+@pytest.fixture
+def hat_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Creates the device-tree HAT entries of a version 1.1 board."""
+    directory = tmp_path / "hat"
+    directory.mkdir()
+    directory.joinpath("product").write_bytes(b"CAN Switcher\n")
+    directory.joinpath("product_ver").write_bytes(b"0x0112\x00")
+    directory.joinpath("custom_0").write_bytes(
+        b"portexpander_address\n\x74\n"
+        b"serial_number\n\x12\xd3-\x01\n"
+        b"usb_switcher_standard\n2.0\n"
+    )
+
+    monkeypatch.setattr(eeprom, "HAT_DIRECTORY", f"{directory}/")
+    monkeypatch.setattr(usb_switcher, "HAT_DIRECTORY", f"{directory}/")
+    monkeypatch.setattr(eeprom.IdEeprom, "_cache", None)
+    return directory
+
+
+@pytest.fixture
+def device(hat_directory: Path, monkeypatch: pytest.MonkeyPatch) -> fake_smbus2.FakePortExpander:
+    """Connects every Portexpander created by the test to the same emulated device."""
+    fake_device = fake_smbus2.FakePortExpander()
+    monkeypatch.setattr(fake_smbus2.SMBus, "device", fake_device)
+    monkeypatch.setattr(usb_switcher, "SMBus", fake_smbus2.SMBus)
+    monkeypatch.setattr(usb_switcher, "i2c_msg", fake_smbus2.i2c_msg, raising=False)
+    return fake_device
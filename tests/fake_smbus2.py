@@ -0,0 +1,95 @@
+"""In-memory stand-in for smbus2 emulating a single PCA9539A port expander."""
+
+
+class FakePortExpander:
+    """Registers of a PCA9539A, shared by every bus opened on it.
+
+    Notes:
+        Multi-byte accesses toggle between the two registers of a pair, like the device does. The
+        input register of a pin configured as output reflects the level of the output latch.
+
+    Attributes:
+        registers: Input, output, polarity inversion and configuration registers of both ports.
+        external: Levels driven on the pins from outside, used for pins configured as input.
+        transactions: Every bus access as (method, register) tuples.
+    """
+
+    def __init__(self) -> None:
+        # power-on defaults: outputs high, no inversion, all pins configured as input
+        self.registers = [0x00, 0x00, 0xFF, 0xFF, 0x00, 0x00, 0xFF, 0xFF]
+        self.external = [0x00, 0x00]
+        self.transactions: list[tuple[str, int]] = []
+
+    def read(self, register: int) -> int:
+        if register > 1:
+            return self.registers[register]
+
+        config = self.registers[6 + register]
+        inputs = (self.external[register] ^ self.registers[4 + register]) & config
+        return inputs | (self.registers[2 + register] & ~config & 0xFF)
+
+    def write(self, register: int, value: int) -> None:
+        # the input registers are read-only
+        if register > 1:
+            self.registers[register] = value & 0xFF
+
+
+class _Message:
+    """Message of a combined transfer, see i2c_msg."""
+
+    def __init__(self, is_read: bool, buf: list[int]) -> None:
+        self.is_read = is_read
+        self.buf = buf
+        self.len = len(buf)
+
+    def __iter__(self):
+        return iter(self.buf)
+
+
+class i2c_msg:  # pylint: disable=invalid-name
+    """Stand-in for smbus2.i2c_msg."""
+
+    @staticmethod
+    def write(address: int, buf: list[int]) -> _Message:
+        return _Message(False, list(buf))
+
+    @staticmethod
+    def read(address: int, length: int) -> _Message:
+        return _Message(True, [0] * length)
+
+
+class SMBus:
+    """Stand-in for smbus2.SMBus, every bus is connected to the same device."""
+
+    device = FakePortExpander()
+
+    def __init__(self, bus: int) -> None:
+        self.bus = bus
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        self.device.transactions.append(("read_byte_data", register))
+        return self.device.read(register)
+
+    def write_byte_data(self, address: int, register: int, value: int) -> None:
+        self.device.transactions.append(("write_byte_data", register))
+        self.device.write(register, value)
+
+    def read_i2c_block_data(self, address: int, register: int, length: int) -> list[int]:
+        self.device.transactions.append(("read_i2c_block_data", register))
+        return [self.device.read(register ^ (index & 1)) for index in range(length)]
+
+    def write_i2c_block_data(self, address: int, register: int, values: list[int]) -> None:
+        self.device.transactions.append(("write_i2c_block_data", register))
+        for index, value in enumerate(values):
+            self.device.write(register ^ (index & 1), value)
+
+    def i2c_rdwr(self, *messages: _Message) -> None:
+        pointer = 0
+        for message in messages:
+            if message.is_read:
+                message.buf = [self.device.read(pointer ^ (i & 1)) for i in range(message.len)]
+            else:
+                pointer = message.buf[0]
+                for index, value in enumerate(message.buf[1:]):
+                    self.device.write(pointer ^ (index & 1), value)
+        self.device.transactions.append(("i2c_rdwr", messages[0].buf[0]))
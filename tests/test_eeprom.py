@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+import eeprom
+from eeprom import IdEeprom
+
+
+class FrameworkError(Exception):
+    """Stands in for the framework exception raised on malformed board info."""
+
+
+def test_decodes_serial_number_and_numeric_values(hat_directory):
+    id_eeprom = IdEeprom()
+
+    assert id_eeprom.manufacturer_data["serial_number"] == "12d3-01"
+    assert id_eeprom.manufacturer_data["portexpander_address"] == 0x74
+
+
+def test_decodes_strings_as_utf8(hat_directory):
+    hat_directory.joinpath("custom_0").write_bytes(
+        b"usb_switcher_standard\n2.0\nlocation\nK\xc3\xb6ln\n"
+    )
+    hat_directory.joinpath("vendor").write_bytes("Bäcker\n".encode())
+
+    id_eeprom = IdEeprom()
+
+    assert id_eeprom.manufacturer_data == {"usb_switcher_standard": "2.0", "location": "Köln"}
+    assert id_eeprom.board_info["vendor"] == ["Bäcker".encode()]
+    assert id_eeprom.board_info_str["vendor"] == ["Bäcker"]
+
+
+def test_decodes_board_version(hat_directory):
+    assert IdEeprom().version == "1.1"
+
+
+def test_reuses_the_decoded_content(hat_directory, monkeypatch: pytest.MonkeyPatch):
+    first = IdEeprom()
+
+    def read_board_info(self) -> None:
+        raise AssertionError("the HAT entries were read again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(IdEeprom, "_read_board_info", read_board_info)
+        second = IdEeprom()
+
+    assert second.manufacturer_data == first.manufacturer_data
+    assert second.version == first.version
+
+    # a change of the directory invalidates the cache
+    hat_directory.joinpath("product_ver").write_bytes(b"0x0102\x00")
+    stat = os.stat(hat_directory)
+    os.utime(hat_directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert IdEeprom().version == "1.0"
+
+
+@pytest.mark.parametrize(
+    ("content", "reason"),
+    [
+        (b"usb_switcher_standard\n2.0", "newline-terminated"),
+        (b"usb_switcher_standard\n\n2.0\n", "non-empty"),
+    ],
+)
+def test_rejects_malformed_custom_data(
+    hat_directory, monkeypatch: pytest.MonkeyPatch, content: bytes, reason: str
+):
+    monkeypatch.setattr(eeprom, "FrameworkError", FrameworkError, raising=False)
+    hat_directory.joinpath("custom_0").write_bytes(content)
+
+    with pytest.raises(FrameworkError, match=reason):
+        IdEeprom()
@@ -0,0 +1,167 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from process_helper import (
+    ResourceLock,
+    ResourceLockCallbackHandler,
+    TerminationAfterInitialFailure,
+    _ResourceLock,
+)
+
+
+class _TerminatingCallbackHandler(ResourceLockCallbackHandler):
+    """Gives up after the first failed attempt instead of waiting for the lock."""
+
+    @property
+    def terminate_after_initial_failure(self) -> bool:
+        return True
+
+    def initial_failure(self) -> None: ...
+
+    def success_after_initial_failure(self) -> None: ...
+
+
+class _SignallingCallbackHandler(ResourceLockCallbackHandler):
+    """Sets an event when the first attempt to acquire the lock fails."""
+
+    def __init__(self, resource_lock: _ResourceLock, waiting) -> None:
+        super().__init__(resource_lock)
+        self.waiting = waiting
+
+    @property
+    def terminate_after_initial_failure(self) -> bool:
+        return False
+
+    def initial_failure(self) -> None:
+        self.waiting.set()
+
+    def success_after_initial_failure(self) -> None: ...
+
+
+def _hold_lock(name: str, directory: Path, mode: str, ready, release) -> None:
+    lock = _ResourceLock(name, parent_directory=directory)
+    with lock if mode == "w" else lock.shared():
+        ready.set()
+        release.wait(10)
+
+
+def _hold_while_waiting(ready, waiting, released_while_waiting) -> None:
+    ini, cache = _ResourceLock("INI"), _ResourceLock("CACHE")
+    with ini:
+        ready.set()
+        waiting.wait(10)
+        # the waiting process must not keep the locks it acquired before the contended one
+        if cache.acquire_nowait():
+            released_while_waiting.set()
+            cache.release()
+
+
+@pytest.fixture
+def holder(tmp_path: Path, fork_context):
+    """Holds the lock "TEST" in a child process in the given mode until the test ends."""
+    processes = []
+    release = fork_context.Event()
+
+    def start(mode: str) -> _ResourceLock:
+        ready = fork_context.Event()
+        process = fork_context.Process(
+            target=_hold_lock, args=("TEST", tmp_path, mode, ready, release)
+        )
+        process.start()
+        processes.append(process)
+        assert ready.wait(10)
+        lock = _ResourceLock("TEST", parent_directory=tmp_path)
+        lock.callback_handler = _TerminatingCallbackHandler(lock)
+        return lock
+
+    yield start
+    release.set()
+    for process in processes:
+        process.join(10)
+
+
+def test_shared_holders_dont_block_each_other(holder):
+    lock = holder("r")
+
+    with lock.shared():
+        pass
+
+
+def test_exclusive_holder_blocks_shared_holders(holder):
+    lock = holder("w")
+
+    with pytest.raises(TerminationAfterInitialFailure):
+        with lock.shared():
+            pass
+
+
+def test_shared_holder_blocks_exclusive_holders(holder):
+    lock = holder("r")
+
+    with pytest.raises(TerminationAfterInitialFailure):
+        lock.acquire()
+    assert not lock.is_locked
+
+
+def test_all_acquired_releases_the_locks_while_waiting(
+    fork_context, monkeypatch: pytest.MonkeyPatch
+):
+    ready, waiting, released_while_waiting = (fork_context.Event() for _ in range(3))
+    ini = ResourceLock.INI.get()
+    monkeypatch.setattr(ini, "callback_handler", _SignallingCallbackHandler(ini, waiting))
+
+    process = fork_context.Process(
+        target=_hold_while_waiting, args=(ready, waiting, released_while_waiting)
+    )
+    process.start()
+    assert ready.wait(10)
+
+    with ResourceLock.all_acquired():
+        assert all(member.get().is_locked for member in ResourceLock)
+    process.join(10)
+
+    assert waiting.is_set()
+    assert released_while_waiting.is_set()
+    assert not any(member.get().is_locked for member in ResourceLock)
+
+
+@pytest.mark.parametrize(("mode", "held_exclusively"), [("w", True), ("r", False)])
+def test_probes_exclusive_holders(holder, mode: str, held_exclusively: bool):
+    lock = holder(mode)
+
+    assert lock.is_held_exclusively() is held_exclusively
+
+
+def test_shared_holder_creates_a_lock_file_for_every_user(tmp_path: Path):
+    lock = _ResourceLock("TEST", parent_directory=tmp_path)
+
+    umask = os.umask(0o022)
+    try:
+        with lock.shared():
+            pass
+    finally:
+        os.umask(umask)
+
+    assert lock.lock_file_path.stat().st_mode & 0o777 == 0o666
+
+
+def test_probe_doesnt_create_the_lock_file(tmp_path: Path):
+    lock = _ResourceLock("TEST", parent_directory=tmp_path)
+
+    assert not lock.is_held_exclusively()
+    assert not lock.lock_file_path.exists()
+
+
+def test_release_signal_can_be_touched_by_every_user(tmp_path: Path):
+    lock = _ResourceLock("TEST", parent_directory=tmp_path)
+
+    umask = os.umask(0o022)
+    try:
+        with lock:
+            pass
+    finally:
+        os.umask(umask)
+
+    assert lock.release_signal_path.stat().st_mode & 0o777 == 0o666
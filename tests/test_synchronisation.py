@@ -0,0 +1,125 @@
+import gc
+import weakref
+import threading
+
+import pytest
+
+from process_helper import (
+    ResourceLock,
+    _ResourceLock,
+)
+from synchronisation import acquires_lock
+
+
+def _hold_lock(ready, release) -> None:
+    with _ResourceLock(ResourceLock.KRAKE.value):
+        ready.set()
+        release.wait(10)
+
+
+def test_rejects_unknown_modes():
+    with pytest.raises(ValueError):
+        acquires_lock(mode="x")
+
+
+def test_exclusive_mode_holds_the_lock():
+    @acquires_lock
+    def function() -> bool:
+        return ResourceLock.KRAKE.get().is_locked
+
+    assert function()
+    assert not ResourceLock.KRAKE.get().is_locked
+
+
+def test_shared_mode_keeps_exclusive_holders_out():
+    @acquires_lock(lock=ResourceLock.KRAKE, mode="r")
+    def function() -> bool:
+        return _ResourceLock(ResourceLock.KRAKE.value).acquire_nowait()
+
+    assert not ResourceLock.KRAKE.get().is_locked
+    assert not function()
+
+
+def test_optimistic_result_is_used_if_the_lock_is_free():
+    calls = []
+
+    @acquires_lock(optimistic=lambda: 0)
+    def function() -> None:
+        calls.append(ResourceLock.KRAKE.get().is_locked)
+
+    function()
+    assert calls == [False]
+
+
+def test_optimistic_call_is_repeated_while_a_writer_holds_the_lock(fork_context):
+    calls = []
+    ready, release = fork_context.Event(), fork_context.Event()
+
+    @acquires_lock(mode="r", optimistic=lambda: 0)
+    def function() -> None:
+        calls.append(ResourceLock.KRAKE.get().is_held_exclusively())
+
+    process = fork_context.Process(target=_hold_lock, args=(ready, release))
+    process.start()
+    assert ready.wait(10)
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    function()
+    timer.join()
+    process.join(10)
+
+    # the lockless call ran while the writer held the lock, the repeated one after its release
+    assert calls == [True, False]
+
+
+def test_optimistic_call_acquires_the_lock_if_the_snapshot_fails():
+    def snapshot() -> None:
+        raise OSError
+
+    @acquires_lock(optimistic=snapshot)
+    def function() -> bool:
+        return ResourceLock.KRAKE.get().is_locked
+
+    assert function()
+
+
+def test_optimistic_call_is_repeated_if_it_fails_without_the_lock():
+    @acquires_lock(optimistic=lambda: 0)
+    def function() -> bool:
+        if not ResourceLock.KRAKE.get().is_locked:
+            raise ValueError("torn read")
+        return True
+
+    assert function()
+
+
+def test_optimistic_call_raises_if_it_fails_with_the_lock():
+    @acquires_lock(optimistic=lambda: 0)
+    def function() -> None:
+        raise ValueError("invalid content")
+
+    with pytest.raises(ValueError):
+        function()
+
+
+def test_decorating_again_reuses_the_wrapper():
+    def function() -> None: ...
+
+    wrapper = acquires_lock(function)
+
+    assert acquires_lock(function) is wrapper
+    assert acquires_lock(mode="r")(function) is not wrapper
+
+
+def test_wrappers_dont_keep_the_functions_alive():
+    references = []
+    for _ in range(3):
+
+        def function() -> None: ...
+
+        acquires_lock(function)()
+        references.append(weakref.ref(function))
+    del function
+    gc.collect()
+
+    assert not any(reference() for reference in references)
@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+
+import pytest
+
+import usb_switcher
+from cli import Action
+from usb_switcher import Portexpander
+
+USB_SWITCH = 1 << 6
+RELAY_1 = 1 << 0
+RELAY_2 = 1 << 1
+RELAY_6 = 1 << 5
+
+
+@pytest.fixture
+def clamps(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Maps clamp 15 to relay 1 and clamp 30 to relay 2 on the external port."""
+    config = SimpleNamespace(RELAYS={"15": 0, "30": 1}, EXTERNAL_PORT=0)
+    monkeypatch.setattr(usb_switcher, "PortExpanderConfig", config, raising=False)
+    for table in (usb_switcher._relay_masks, usb_switcher._relay_ids):
+        table.cache_clear()
+    yield
+    for table in (usb_switcher._relay_masks, usb_switcher._relay_ids):
+        table.cache_clear()
+
+
+def test_pin_update_keeps_changes_of_other_instances(device):
+    first = Portexpander()
+    second = Portexpander()
+
+    first.enable_usb_switch_pin()
+    second.enable_external_relay(1)
+
+    assert device.registers[2] & USB_SWITCH
+    assert not device.registers[2] & RELAY_1
+
+
+def test_default_pin_state_keeps_changes_of_other_instances(device):
+    first = Portexpander()
+    second = Portexpander()
+
+    first.enable_usb_switch_pin()
+    second.enable_external_relay(1)
+    second.set_default_pin_state("Relay")
+
+    assert device.registers[2] & USB_SWITCH
+    assert device.registers[2] & RELAY_1
+
+
+def test_initialises_default_configuration(device):
+    Portexpander()
+
+    # only Relay_6 is an input
+    assert device.registers[6:8] == [RELAY_6, 0x00]
+    # relays are off (high), the USB switch is low and the EEPROM write protection is enabled
+    assert device.registers[2] & ~RELAY_6 == 0x9F
+    assert device.registers[3] == 0x00
+
+
+def test_verify_writes_reads_the_port_back(device):
+    expander = Portexpander(verify_writes=True)
+    device.transactions.clear()
+
+    assert expander.set_gpio_port_output_level(1, 0x5A)
+    assert expander.pinstate[1] == 0x5A
+    assert device.transactions == [("i2c_rdwr", 0x03)]
+
+    # the input pin of port 0 doesn't follow the output register
+    device.external[0] = 0x00
+    assert not expander.set_gpio_port_output_level(0, 0xFF)
+
+
+def test_writes_are_not_read_back_by_default(device):
+    expander = Portexpander()
+    device.transactions.clear()
+
+    assert expander.set_gpio_port_output_level(1, 0x5A)
+    assert device.registers[3] == 0x5A
+    assert device.transactions == [("write_byte_data", 0x03)]
+
+
+def test_port_levels_are_read_as_a_register_pair(device):
+    expander = Portexpander()
+    device.external[0] = RELAY_6
+    device.transactions.clear()
+
+    levels = expander.read_all_port_levels()
+
+    assert levels == (device.registers[2] | RELAY_6, device.registers[3])
+    assert device.transactions == [("i2c_rdwr", 0x00)]
+    assert expander._read_register_pair(0x06) == [RELAY_6, 0x00]
+
+
+def test_clamp_update_keeps_changes_of_other_instances(device, clamps):
+    first = Portexpander()
+    second = Portexpander()
+
+    first.set_clamp("15", Action.off, sleep_duration=0)
+    second.set_clamp("30", "off", sleep_duration=0)
+
+    assert not device.registers[2] & (RELAY_1 | RELAY_2)
+
+
+def test_clamp_levels_are_read_after_a_write(device, clamps):
+    first = Portexpander()
+    second = Portexpander()
+    first.set_clamps({"15": Action.off, "30": Action.on}, sleep_duration=0)
+    second.set_clamp("30", Action.off, sleep_duration=0)
+    device.transactions.clear()
+
+    assert [clamp.state for clamp in first.get_clamp_pin_levels()] == ["off", "off"]
+    assert device.transactions == [("i2c_rdwr", 0x00)]
+
+    # a recent reading is reused
+    device.transactions.clear()
+    first.get_clamp_pin_levels()
+    assert device.transactions == []
+
+
+def test_pin_direction_update_keeps_changes_of_other_instances(device):
+    first = Portexpander()
+    second = Portexpander()
+
+    first.set_gpio_pin_as_input(1, 0)
+    second.set_gpio_pin_as_input(1, 1)
+    assert device.registers[7] == 0b011
+
+    first.set_gpio_pin_as_input(1, 2)
+    second.set_gpio_pin_as_output(1, 0)
+    assert device.registers[7] == 0b110
@@ -1,14 +1,12 @@
+import os
 import time
 import logging
 from process_helper import ResourceLock
 from synchronisation import acquires_lock
 from cli import Action
-from eeprom import IdEeprom
-
-# configure globally
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] %(levelname)s in %(module)s: %(message)s'
+from eeprom import (
+    IdEeprom,
+    HAT_DIRECTORY,
 )
 
 logger = logging.getLogger(__name__)
@@ -16,6 +14,7 @@ logger = logging.getLogger(__name__)
 # import subprocess
 from typing import (
     Iterable,
+    NamedTuple,
     TYPE_CHECKING,
 )
 # from pathlib import Path
@@ -28,12 +27,46 @@ from typing import (
 #     suppress,
 #     contextmanager,
 # )
+from functools import (
+    cache,
+    cached_property,
+)
 from dataclasses import dataclass
-from enum import Enum
 
-class ResourceLock(Enum):
-    TARGET_INTERACTION = "target_interaction"
-    USB_ACCESS = "usb_access"
+try:
+    from smbus2 import (
+        SMBus,
+        i2c_msg,
+    )
+except ImportError:
+    # only available on the Raspberry Pi, checked when the port expander is initialised
+    SMBus = None
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# bits of every possible port level, least significant bit first
+_BYTE_TO_BITS = tuple(tuple((byte >> i) & 1 for i in range(8)) for byte in range(256))
+
+# state names indexed by the logical level of a pin
+_STATE: tuple[str, str] = ("off", "on")
+
+@cache
+def _relay_masks() -> dict[str, int]:
+    """Returns the mask byte of every clamp relay in the external port, by clamp id. Built on
+    first use instead of at import, so importing the module doesn't depend on the relay config.
+    """
+    return {clamp_id: 1 << pin for clamp_id, pin in PortExpanderConfig.RELAYS.items()}
+
+@cache
+def _relay_ids() -> frozenset[str]:
+    """Returns the ids of the supported clamps, built on first use like _relay_masks."""
+    return frozenset(PortExpanderConfig.RELAYS)
+
+@cache
+def _supported_relays_str() -> str:
+    """Returns the ids of the supported clamps as listed in error messages."""
+    return ", ".join(PortExpanderConfig.RELAYS)
 
 class USBConnectError(Exception):
     def __init__(self, target: str, message: str = "Failed to connect USB"):
@@ -41,7 +74,7 @@ class USBConnectError(Exception):
         self.message = f"{message}: {target}"
         super().__init__(self.message)
 
-@dataclass
+@dataclass(slots=True)
 class Clamp:
     """Stores the output levels of the pin associated with a clamp.
 
@@ -53,6 +86,25 @@ class Clamp:
     name: str
     state: str = "unknown"
 
+class PinRecord(NamedTuple):
+    """Stores the settings of a pin from the pinout.
+
+    Attributes:
+        name: name of the pin.
+        port: port index of the pin.
+        pin: pin number in the port.
+        direction: "in" or "out".
+        default: default output level of the pin.
+        mask: mask byte of the pin in the port.
+    """
+
+    name: str
+    port: int
+    pin: int
+    direction: str
+    default: int
+    mask: int
+
 class Portexpander:
     """Class for interfacing the PCA9539APW IO port expander from NXP.
     See the datasheet for further information:
@@ -76,6 +128,12 @@ class Portexpander:
     __configurationReg0 = 0x06
     __configurationReg1 = 0x07
 
+    # registers of port 0 and port 1, indexed by the port index
+    _INPUT_REGS = (__inputReg0, __inputReg1)
+    _OUTPUT_REGS = (__outputReg0, __outputReg1)
+    _POLARITY_REGS = (__polarityInvReg0, __polarityInvReg1)
+    _CONFIG_REGS = (__configurationReg0, __configurationReg1)
+
     DEFAULT_PINOUT: dict[str, dict[str, int]] = {
         "Relay_1": {"port": 0, "pin": 0, "direction": "out", "default": 1},
         "Relay_2": {"port": 0, "pin": 1, "direction": "out", "default": 1},
@@ -118,20 +176,28 @@ class Portexpander:
         "1.2": DEFAULT_PINOUT,
     }
 
-    def __init__(self, address: int = 0x74) -> None:
+    def __init__(self, address: int = 0x74, verify_writes: bool = False) -> None:
         """Constructor of the class.
 
+        Args:
+            address: I2C device address used if the EEPROM is unprogrammed. Defaults to 0x74.
+            verify_writes: Whether the port levels and directions are read back after every update.
+                Defaults to False.
+
         Attributes:
             i2c_bus: Index of the I2C peripheral.
             i2c_addr: Address of the I2C device.
             config: Pin configuration information.
             pinstate: State of the pins, binary coded.
             instance: Object for the I2C instance.
+            verify_writes: Whether the port levels and directions are read back after every update.
 
         Raises:
+            SMBusPeripheralError: If smbus2 is not installed.
             USBConnectError: If the pin layout could not be determined.
         """
-        from smbus import SMBus
+        if SMBus is None:
+            raise SMBusPeripheralError("smbus2 is not installed!")
 
         id_eep = IdEeprom()
 
@@ -151,6 +217,12 @@ class Portexpander:
             "inverted": [None, None],
         }
         self.pinstate = [None, None]
+        self.verify_writes = verify_writes
+        # (timestamp, levels) of the last reading of both ports and its lifetime in seconds
+        self._port_levels_cache: tuple[float, tuple[int, int]] | None = None
+        self._port_levels_ttl = 0.005
+        # monotonic time until which the clamps are settling after the last change
+        self._next_allowed = 0.0
 
         # set the default pinout on the CAN Switcher PCB.
         self.pinout: dict[str, dict[str, int]] = self.VERSION_TO_PINOUT_MAPPING.get(self.version)
@@ -163,6 +235,8 @@ class Portexpander:
         try:
             # initialise the bus
             self.instance = SMBus(self.i2c_bus)
+            self._read_byte = self.instance.read_byte_data
+            self._write_byte = self.instance.write_byte_data
 
             # update configuration
             self._get_configuration()
@@ -198,21 +272,22 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        # write register
-        self._write_port_outputs(port_index, level)
-        # check state
-        data = self.get_gpio_port_level(port_index)
-
-        if data != level:
+        if port_index not in (0, 1):
             return False
 
-        return True
+        # write register and check state
+        return self._write_outputs(port_index, level)
 
+    @acquires_lock(lock=ResourceLock.TARGET_INTERACTION)
     def set_gpio_pin_output_level(self, port_index: int, pin_number: int, level: int) -> bool:
         """Updates the state of a pin. Every pin is binary coded in the byte and can
         be at a logical "1" (high) or a logical "0" (low) state. This polarity
         can be inverted if necessary.
 
+        Notes:
+            The output register is read while holding the lock, as other processes may have
+            changed it since this instance last wrote it.
+
         Args:
             port_index: Port index of the I2C device.
             pin_number: Pin number of the selected port.
@@ -221,42 +296,55 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        logger.warning(f"Setting pin {pin_number} on port {port_index} to {level}")
-        # get current state
-        data = self.get_gpio_port_level(port_index)
-
-        if data is None:
+        logger.debug("Setting pin %s on port %s to %s", pin_number, port_index, level)
+        if port_index not in (0, 1):
             return False
 
-        # update current state with new pin level
-        new_data = (data & ~(1 << pin_number)) + (level << pin_number)
-        # write register
-        self._write_port_outputs(port_index, new_data)
-        # check new state
-        data = self.get_gpio_port_level(port_index)
+        # get current state from the output register, the input register doesn't necessarily
+        # reflect the output latch
+        data = self._read_port_outputs(port_index)
 
-        if data != new_data:
-            return False
+        # update current state with new pin level
+        new_data = (data & ~(1 << pin_number)) | ((level & 1) << pin_number)
 
-        return True
+        # write register and check state
+        return self._write_outputs(port_index, new_data)
 
     def get_gpio_port_level(self, port_index: int) -> int:
         """Reads the current state of the port. Every pin is binary coded in the byte
         and has a logical "1" at high level and a logical "0" at low level.
 
+        Notes:
+            A reading of read_all_port_levels younger than _port_levels_ttl is reused, so
+            polling several ports or pins doesn't access the bus every time.
+
         Args:
             port_index: Port index of the I2C device.
 
         Returns:
             One byte of data, None if port index does not exist.
         """
-        data = self._read_port_inputs(port_index)
+        if port_index not in (0, 1):
+            return None
 
-        # data received from valid port index
-        if data is not None:
-            self.pinstate[port_index] = data
+        cache = self._port_levels_cache
+        if cache is not None and time.monotonic() - cache[0] < self._port_levels_ttl:
+            return cache[1][port_index]
+
+        return self.read_all_port_levels()[port_index]
+
+    def read_all_port_levels(self) -> tuple[int, int]:
+        """Reads the current state of both ports with a single transaction. Writing the outputs
+        discards the reading reused by get_gpio_port_level.
+
+        Returns:
+            The levels of port 0 and port 1.
+        """
+        levels = tuple(self._read_register_pair(self.__inputReg0))
+        self.pinstate[0], self.pinstate[1] = levels
+        self._port_levels_cache = (time.monotonic(), levels)
 
-        return data
+        return levels
 
     def get_gpio_port_level_detail(self, port_index: int) -> list:
         """Reads the current state of the port. Every pin is binary coded in the byte
@@ -271,12 +359,7 @@ class Portexpander:
         # update pinstate
         self.pinstate[port_index] = self.get_gpio_port_level(port_index)
 
-        data = []
-
-        for i in range(8):
-            data.append((self.pinstate[port_index] & (1 << i)) >> i)
-
-        return data
+        return list(_BYTE_TO_BITS[self.pinstate[port_index]])
 
     def get_gpio_port_output_level(self, port_index: int) -> int:
         """Reads the current state of the port. Every pin is binary coded in the byte
@@ -306,21 +389,17 @@ class Portexpander:
         if port_index not in (0, 1):
             return None
 
-        data = self.get_gpio_port_level_detail(port_index)
-
-        state = {}
-
-        for i, key in enumerate(self.pinout.keys()):
-            if port_index == 0 and i < 8:
-                if "Relay" in key:
-                    state[key] = "off" if data[i] == 1 else "on"
-                else:
-                    state[key] = "off" if data[i] == 0 else "on"
-
-            elif port_index == 1 and i >= 8:
-                state[key] = "off" if data[i - 8] == 0 else "on"
+        data = self.get_gpio_port_level(port_index)
 
-        return state
+        # relays are active low, their level is inverted
+        return {
+            key: _STATE[((data >> pin) & 1) ^ inverted]
+            for key, pin, inverted in zip(
+                self._port_keys[port_index],
+                self._port_pins[port_index],
+                self._port_inverted[port_index],
+            )
+        }
 
     def get_input_pin_state_dict(self) -> dict:
         """Reads the input configuration settings of the ports.
@@ -328,13 +407,10 @@ class Portexpander:
         Returns:
             Dictionary with state of input pins.
         """
-        inputs = self._read_port_inputs(0)
+        # read the inputs of both ports with a single transaction
+        inputs = self.read_all_port_levels()
 
-        return {
-            key: (inputs & (1 << index)) >> index
-            for index, (key, value) in enumerate(self.pinout.items())
-            if value["direction"] == "in"
-        }
+        return {key: (inputs[port] >> pin) & 1 for key, port, pin in self._input_entries}
 
     def set_default_io_direction(self) -> bool:
         """Sets the IO configuration of the ports to default values.
@@ -343,19 +419,22 @@ class Portexpander:
             True if success else False.
         """
         default = self.get_default_io_direction()
+        port_config = [0xFF - default[0], 0xFF - default[1]]
 
-        for i in range(2):
-            port_config = 0xFF - default[i]
-            self._write_port_configuration(i, port_config)
+        # configure both ports with a single transaction
+        self._write_register_pair(self.__configurationReg0, port_config)
 
-            # validate settings
-            if self._read_port_configuration(i) != port_config:
-                logger.error(f"Port {i} direction not set to {port_config}!")
-                return False
+        # validate settings
+        if self.verify_writes:
+            data = self._read_register_pair(self.__configurationReg0)
+            for i in range(2):
+                if data[i] != port_config[i]:
+                    logger.error("Port %s direction not set to %s!", i, port_config[i])
+                    return False
 
-            # update information
-            self.config["input"][i] = port_config
-            self.config["output"][i] = default[i]
+        # update information
+        self.config["input"] = port_config
+        self.config["output"] = list(default)
 
         return True
 
@@ -365,13 +444,16 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        for i in range(2):
-            # set inputs
-            self.set_gpio_port_as_input(i)
-            # validate settings
-            if self.config["input"][i] != 0xFF:
-                return False
+        port_config = [0xFF, 0xFF]
+        self._write_register_pair(self.__configurationReg0, port_config)
+
+        # validate settings
+        if self.verify_writes and self._read_register_pair(self.__configurationReg0) != port_config:
+            return False
 
+        # update information
+        self.config["input"] = port_config
+        self.config["output"] = [0, 0]
         return True
 
     def set_all_pins_as_output(self) -> bool:
@@ -381,13 +463,16 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        for i in range(2):
-            # set inputs
-            self.set_gpio_port_as_output(i)
-            # validate settings
-            if self.config["output"][i] != 0xFF:
-                return False
+        port_config = [0x00, 0x00]
+        self._write_register_pair(self.__configurationReg0, port_config)
+
+        # validate settings
+        if self.verify_writes and self._read_register_pair(self.__configurationReg0) != port_config:
+            return False
 
+        # update information
+        self.config["input"] = port_config
+        self.config["output"] = [0xFF, 0xFF]
         return True
 
     def set_gpio_port_as_input(self, port_index: int) -> bool:
@@ -399,12 +484,11 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        self._write_port_configuration(port_index, 0xFF)
+        if not self._write_port_configuration(port_index, 0xFF):
+            return False
 
         # validate settings
-        data = self._read_port_configuration(port_index)
-
-        if data != 0xFF:
+        if self.verify_writes and self._read_port_configuration(port_index) != 0xFF:
             return False
 
         # update information
@@ -422,11 +506,11 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        self._write_port_configuration(port_index, 0x00)
+        if not self._write_port_configuration(port_index, 0x00):
+            return False
 
         # validate settings
-        data = self._read_port_configuration(port_index)
-        if data != 0x00:
+        if self.verify_writes and self._read_port_configuration(port_index) != 0x00:
             return False
 
         # update information
@@ -434,9 +518,14 @@ class Portexpander:
         self.config["output"][port_index] = 0xFF
         return True
 
+    @acquires_lock(lock=ResourceLock.TARGET_INTERACTION)
     def set_gpio_pin_as_input(self, port_index: int, pin_number: int) -> bool:
         """Sets a GPIO pin as input.
 
+        Notes:
+            The configuration register is read while holding the lock, as other processes may
+            have changed it since this instance last wrote it.
+
         Args:
             port_index: Port index of the I2C device.
             pin_number: Pin number of the port.
@@ -444,31 +533,34 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        # get current state
-        data = self._read_port_configuration(port_index)
-
-        if data is None:
+        if port_index not in (0, 1):
             return False
 
+        # get current state from the configuration register
+        data = self._read_port_configuration(port_index)
+
         # update current state with new pin level
-        new_data = (data & ~(1 << pin_number)) + (1 << pin_number)
+        new_data = data | (1 << pin_number)
         # write register
         self._write_port_configuration(port_index, new_data)
         # check new state
-        data = self._read_port_configuration(port_index)
-
-        if data != new_data:
+        if self.verify_writes and self._read_port_configuration(port_index) != new_data:
             return False
 
         # update information
-        self.config["input"][port_index] = data
-        self.config["output"][port_index] = 0xFF - data
+        self.config["input"][port_index] = new_data
+        self.config["output"][port_index] = 0xFF - new_data
         return True
 
+    @acquires_lock(lock=ResourceLock.TARGET_INTERACTION)
     def set_gpio_pin_as_output(self, port_index: int, pin_number: int) -> bool:
         """Sets a GPIO pin as output with the current output level.
         Check the output level first to prevent undefined behaviour.
 
+        Notes:
+            The configuration register is read while holding the lock, as other processes may
+            have changed it since this instance last wrote it.
+
         Args:
             port_index: Port index of the I2C device.
             pin_number: Pin number of the port.
@@ -476,25 +568,23 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        # get current state
-        data = self._read_port_configuration(port_index)
-
-        if data is None:
+        if port_index not in (0, 1):
             return False
 
+        # get current state from the configuration register
+        data = self._read_port_configuration(port_index)
+
         # update current state with new pin level
-        new_data = (data & ~(1 << pin_number)) + (0 << pin_number)
+        new_data = data & ~(1 << pin_number)
         # write register
         self._write_port_configuration(port_index, new_data)
         # check new state
-        data = self._read_port_configuration(port_index)
-
-        if data != new_data:
+        if self.verify_writes and self._read_port_configuration(port_index) != new_data:
             return False
 
         # update information
-        self.config["input"][port_index] = data
-        self.config["output"][port_index] = 0xFF - data
+        self.config["input"][port_index] = new_data
+        self.config["output"][port_index] = 0xFF - new_data
         return True
 
     def get_configuration(self) -> dict:
@@ -505,6 +595,23 @@ class Portexpander:
         """
         return self._get_configuration()
 
+    def audit_configuration(self) -> bool:
+        """Compares the configuration of the device with the known configuration, e.g. to
+        periodically check the direction changes that are not read back.
+
+        Returns:
+            True if the configuration matches else False, the known configuration is updated
+            with the one of the device in this case.
+        """
+        expected = list(self.config["input"]), list(self.config["inverted"])
+        config = self._get_configuration()
+
+        if (config["input"], config["inverted"]) != expected:
+            logger.warning("Port configuration changed unexpectedly, expected %s", expected)
+            return False
+
+        return True
+
     def get_default_io_direction(self) -> list[int, int]:
         """Gets the default output configuration from pinout mapping.
         A high bit reflects an output and a low bit reflects an input.
@@ -512,14 +619,8 @@ class Portexpander:
         Returns:
             A list with two integers as a bitmask of each port.
         """
-        default_output_settings = [0, 0]
-
-        for value in self.pinout.values():
-            # set bit position to high for output
-            if value["direction"] == "out":
-                default_output_settings[value["port"]] += 1 << value["pin"]
-
-        return default_output_settings
+        # copy, so the caller can't modify the cached value
+        return list(self._default_io_direction)
 
     def enable_can_channel_relay(self, channel: int) -> bool:
         """Enables a hardware relay channel on the PCB.
@@ -534,18 +635,8 @@ class Portexpander:
         if channel < 1 or channel > 8:
             raise CanSwitcherChannelError(f"CAN Switcher channel {channel} is not available.")
 
-        # get the pin mask of channel
-        for key, value in self.pinout.items():
-            # select channel
-            pinmask = (
-                value["mask"]
-                if (key.startswith("Route_CAN") and value["pin"] == channel - 1)
-                else None
-            )
-
-            if pinmask is not None:
-                port = value["port"]
-                break
+        # get the port and pin mask of channel
+        port, pinmask = self._can_channel_table[channel - 1]
 
         # enable CAN channel and disable all other channel relays to prevent cross link,
         # channels needs to be on the same port
@@ -557,8 +648,8 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        # grep the port of first CAN channel, all channels are on the same port
-        return self.set_gpio_port_output_level(self.pinout["Route_CAN_1"]["port"], 0x00)
+        # all channels are on the same port
+        return self.set_gpio_port_output_level(self._can_route_port, 0x00)
 
     def enable_can_interface_bridge(self) -> bool:
         """Connects CAN0 and CAN1 physically on the PCB.
@@ -566,10 +657,9 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        if "Switch_CAN_Short" in self.pinout:
-            return self.set_gpio_pin_output_level(
-                self.pinout["Switch_CAN_Short"]["port"], self.pinout["Switch_CAN_Short"]["pin"], 1
-            )
+        if self._can_short is not None:
+            port, pin = self._can_short
+            return self.set_gpio_pin_output_level(port, pin, 1)
         return False
 
     def disable_can_interface_bridge(self) -> bool:
@@ -578,10 +668,9 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        if "Switch_CAN_Short" in self.pinout:
-            return self.set_gpio_pin_output_level(
-                self.pinout["Switch_CAN_Short"]["port"], self.pinout["Switch_CAN_Short"]["pin"], 0
-            )
+        if self._can_short is not None:
+            port, pin = self._can_short
+            return self.set_gpio_pin_output_level(port, pin, 0)
         return False
 
     def enable_usb_switch_pin(self) -> bool:
@@ -590,9 +679,8 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        return self.set_gpio_pin_output_level(
-            self.pinout["USB_Switch"]["port"], self.pinout["USB_Switch"]["pin"], 1
-        )
+        port, pin = self._usb_switch
+        return self.set_gpio_pin_output_level(port, pin, 1)
 
     def disable_usb_switch_pin(self) -> bool:
         """Sets the pin state to enable connection to external USB port.
@@ -600,9 +688,8 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        return self.set_gpio_pin_output_level(
-            self.pinout["USB_Switch"]["port"], self.pinout["USB_Switch"]["pin"], 0
-        )
+        port, pin = self._usb_switch
+        return self.set_gpio_pin_output_level(port, pin, 0)
 
     def enable_eeprom_write_protection(self) -> bool:
         """Enables the EEPROM write protection if available.
@@ -610,10 +697,9 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        if "Eeprom_WP" in self.pinout:
-            return self.set_gpio_pin_output_level(
-                self.pinout["Eeprom_WP"]["port"], self.pinout["Eeprom_WP"]["pin"], 1
-            )
+        if self._eeprom_wp is not None:
+            port, pin = self._eeprom_wp
+            return self.set_gpio_pin_output_level(port, pin, 1)
 
         return False
 
@@ -623,10 +709,9 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        if "Eeprom_WP" in self.pinout:
-            return self.set_gpio_pin_output_level(
-                self.pinout["Eeprom_WP"]["port"], self.pinout["Eeprom_WP"]["pin"], 0
-            )
+        if self._eeprom_wp is not None:
+            port, pin = self._eeprom_wp
+            return self.set_gpio_pin_output_level(port, pin, 0)
 
         return False
 
@@ -642,9 +727,8 @@ class Portexpander:
         if number not in range(1, 7):
             raise RelayIndexError()
 
-        return self.set_gpio_pin_output_level(
-            self.pinout[f"Relay_{number}"]["port"], self.pinout[f"Relay_{number}"]["pin"], 0
-        )
+        port, pin = self._relay[number]
+        return self.set_gpio_pin_output_level(port, pin, 0)
 
     def disable_external_relay(self, number: int) -> bool:
         """Disables the selected relay channel.
@@ -661,9 +745,8 @@ class Portexpander:
         if number not in range(1, 7):
             raise RelayIndexError()
 
-        return self.set_gpio_pin_output_level(
-            self.pinout[f"Relay_{number}"]["port"], self.pinout[f"Relay_{number}"]["pin"], 1
-        )
+        port, pin = self._relay[number]
+        return self.set_gpio_pin_output_level(port, pin, 1)
 
     @acquires_lock(lock=ResourceLock.TARGET_INTERACTION)
     def set_default_pin_state(self, name_filter: str = "") -> bool:
@@ -676,21 +759,27 @@ class Portexpander:
         Returns:
             True if success else False.
         """
+        # collect the pins to reset per port
+        port_masks = [0, 0]
+        for record in self._pin_records:
+            if name_filter in record.name:
+                port_masks[record.port] |= record.mask
+
         # flag as return value
         success = True
 
-        for name, entry in self.pinout.items():
-            if name_filter not in name:
+        for port, mask in enumerate(port_masks):
+            if not mask:
                 continue
 
-            pin = entry["pin"]
-            port = entry["port"]
-            default = entry["default"]
+            # apply the defaults of the selected pins with a single write per port, based on the
+            # output register as other processes may have changed it
+            outputs = self._read_port_outputs(port)
+            level = (outputs & ~mask) | (self._default_port_level[port] & mask)
 
-            logger.debug(f"Set port {port} pin {pin} to level {default}")
-            # try to set every pin
-            if not self.set_gpio_pin_output_level(port, pin, default):
-                logger.warning(f"Port {port} pin {pin} not set to {default}")
+            logger.debug("Set port %s to level %s", port, level)
+            if not self.set_gpio_port_output_level(port, level):
+                logger.warning("Port %s not set to %s", port, level)
                 # set flag
                 success = False
 
@@ -702,7 +791,8 @@ class Portexpander:
         Returns:
             Dictionary with the default pin states.
         """
-        return {key: value["default"] for key, value in self.pinout.items()}
+        # copy, so the caller can't modify the cached value
+        return dict(self._default_pin_state)
 
     # Basics
     def _get_configuration(self) -> dict:
@@ -711,24 +801,75 @@ class Portexpander:
         Returns:
             Configuration information of the device.
         """
-        # check inputs and outputs
-        self.config["input"][0] = self._read_port_configuration(0)
-        self.config["input"][1] = self._read_port_configuration(1)
+        # check inputs and outputs, both ports with a single transaction
+        self.config["input"] = self._read_register_pair(self.__configurationReg0)
 
         # if a pin is not an input it is an output
-        self.config["output"][0] = 0xFF - self.config["input"][0]
-        self.config["output"][1] = 0xFF - self.config["input"][1]
+        self.config["output"] = [0xFF - self.config["input"][0], 0xFF - self.config["input"][1]]
 
         # check polarity inversion settings
-        self.config["inverted"][0] = self._read_port_polarity_inversion(0)
-        self.config["inverted"][1] = self._read_port_polarity_inversion(1)
+        self.config["inverted"] = self._read_register_pair(self.__polarityInvReg0)
 
         return self.config
 
     def _create_pin_mask_from_pinout(self) -> None:
-        """Creates a mask byte for every pin from the pinout."""
-        for value in self.pinout.values():
-            value["mask"] = 1 << value["pin"]
+        """Creates a mask byte for every pin, the default level of every port and the lookup
+        tables used when accessing pins from the pinout."""
+        records = []
+        pinout = {}
+        for key, value in self.pinout.items():
+            mask = 1 << value["pin"]
+            records.append(
+                PinRecord(
+                    key, value["port"], value["pin"], value["direction"], value["default"], mask
+                )
+            )
+            # the pinouts of the class are shared between versions and instances, store a copy
+            pinout[key] = {**value, "mask": mask}
+        self.pinout = pinout
+        self._pin_records = tuple(records)
+
+        self._default_pin_state = {record.name: record.default for record in self._pin_records}
+        self._default_port_level = [0, 0]
+        self._default_io_direction = [0, 0]
+        for record in self._pin_records:
+            self._default_port_level[record.port] |= record.default << record.pin
+            # set bit position to high for output
+            if record.direction == "out":
+                self._default_io_direction[record.port] |= record.mask
+
+        # (port, mask) of every CAN channel relay, indexed by channel - 1
+        self._can_channel_table: list[tuple[int, int] | None] = [None] * 8
+        for record in self._pin_records:
+            if record.name.startswith("Route_CAN_"):
+                channel = int(record.name.rsplit("_", 1)[1])
+                self._can_channel_table[channel - 1] = (record.port, record.mask)
+        self._can_route_port = self.pinout["Route_CAN_1"]["port"]
+
+        # (port, pin number) of the named pins, None if the pin isn't available on the board
+        pin_locations = {record.name: (record.port, record.pin) for record in self._pin_records}
+        self._usb_switch = pin_locations["USB_Switch"]
+        self._eeprom_wp = pin_locations.get("Eeprom_WP")
+        self._can_short = pin_locations.get("Switch_CAN_Short")
+        # indexed by the relay number, index 0 is unused
+        self._relay = [None] + [pin_locations[f"Relay_{number}"] for number in range(1, 7)]
+
+        # names, pin numbers and polarity inversion of the pins per port, ordered by pin number
+        pins_per_port = ([], [])
+        for record in self._pin_records:
+            pins_per_port[record.port].append((record.pin, record.name))
+        self._port_keys = tuple(tuple(key for _, key in sorted(pins)) for pins in pins_per_port)
+        self._port_pins = tuple(tuple(pin for pin, _ in sorted(pins)) for pins in pins_per_port)
+        self._port_inverted = tuple(
+            tuple(int("Relay" in key) for _, key in sorted(pins)) for pins in pins_per_port
+        )
+
+        # (name, port, pin number) of the input pins
+        self._input_entries = tuple(
+            (record.name, record.port, record.pin)
+            for record in self._pin_records
+            if record.direction == "in"
+        )
 
     def _check_io_settings(self) -> bool:
         """Checks the current IO setting against the default setting.
@@ -739,13 +880,13 @@ class Portexpander:
         # get current output settings
         output_settings = self.config["output"]
         # get default settings
-        default_output_settings = self.get_default_io_direction()
+        default_output_settings = self._default_io_direction
 
         # compare to default settings
         if output_settings != default_output_settings:
             logger.debug("Current port configuration is not the default")
-            logger.debug(f"-> expected: {default_output_settings}")
-            logger.debug(f"-> current:  {output_settings}")
+            logger.debug("-> expected: %s", default_output_settings)
+            logger.debug("-> current:  %s", output_settings)
             return False
 
         return True
@@ -759,14 +900,11 @@ class Portexpander:
         Returns:
             One byte of data, None if port index does not exist.
         """
-        reg = [self.__configurationReg0, self.__configurationReg1]
-
-        try:
-            return self._read_register_data(self.i2c_addr, reg[port_index])
-
-        except IndexError:
+        if port_index not in (0, 1):
             return None
 
+        return self._read_byte(self.i2c_addr, self._CONFIG_REGS[port_index])
+
     def _read_port_inputs(self, port_index: int):
         """Reads port input register data.
 
@@ -776,14 +914,11 @@ class Portexpander:
         Returns:
             One byte of data, None if port index does not exist.
         """
-        reg = [self.__inputReg0, self.__inputReg1]
-
-        try:
-            return self._read_register_data(self.i2c_addr, reg[port_index])
-
-        except IndexError:
+        if port_index not in (0, 1):
             return None
 
+        return self._read_byte(self.i2c_addr, self._INPUT_REGS[port_index])
+
     def _read_port_outputs(self, port_index: int) -> int:
         """Reads port output register data.
 
@@ -793,14 +928,11 @@ class Portexpander:
         Returns:
             One byte of data, None if port index does not exist.
         """
-        reg = [self.__outputReg0, self.__outputReg1]
-
-        try:
-            return self._read_register_data(self.i2c_addr, reg[port_index])
-
-        except IndexError:
+        if port_index not in (0, 1):
             return None
 
+        return self._read_byte(self.i2c_addr, self._OUTPUT_REGS[port_index])
+
     def _read_port_polarity_inversion(self, port_index: int) -> int:
         """Reads port polarity inversion register data.
 
@@ -810,14 +942,11 @@ class Portexpander:
         Returns:
             One byte of data, None if port index does not exist.
         """
-        reg = [self.__polarityInvReg0, self.__polarityInvReg1]
-
-        try:
-            return self._read_register_data(self.i2c_addr, reg[port_index])
-
-        except IndexError:
+        if port_index not in (0, 1):
             return None
 
+        return self._read_byte(self.i2c_addr, self._POLARITY_REGS[port_index])
+
     def _write_port_configuration(self, port_index: int, value: int) -> bool:
         """Writes port configuration register data.
 
@@ -828,15 +957,12 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        reg = [self.__configurationReg0, self.__configurationReg1]
-
-        try:
-            self._write_register_data(self.i2c_addr, reg[port_index], value)
-            return True
-
-        except IndexError:
+        if port_index not in (0, 1):
             return False
 
+        self._write_byte(self.i2c_addr, self._CONFIG_REGS[port_index], value)
+        return True
+
     def _write_port_outputs(self, port_index: int, value: int) -> bool:
         """Writes port output register data.
 
@@ -847,15 +973,12 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        reg = [self.__outputReg0, self.__outputReg1]
-
-        try:
-            self._write_register_data(self.i2c_addr, reg[port_index], value)
-            return True
-
-        except IndexError:
+        if port_index not in (0, 1):
             return False
 
+        self._write_byte(self.i2c_addr, self._OUTPUT_REGS[port_index], value)
+        return True
+
     def _write_port_polarity_inversion(self, port_index: int, value: int) -> bool:
         """Writes port polarity inversion register data.
 
@@ -866,36 +989,75 @@ class Portexpander:
         Returns:
             True if success else False.
         """
-        reg = [self.__polarityInvReg0, self.__polarityInvReg1]
+        if port_index not in (0, 1):
+            return False
 
-        try:
-            self._write_register_data(self.i2c_addr, reg[port_index], value)
-            return True
+        self._write_byte(self.i2c_addr, self._POLARITY_REGS[port_index], value)
+        return True
 
-        except IndexError:
-            return False
+    def _read_register_pair(self, register: int) -> list[int]:
+        """Reads a register and the other register of its pair (port 0 and port 1) with a single
+        transaction. The device toggles between the two registers of a pair while reading.
 
-    def _read_register_data(self, i2c_addr: int, register: int) -> int:
-        """Writes data from the device.
+        Args:
+            register: Register of port 0.
+
+        Returns:
+            A list with the data of both registers.
+        """
+        return self._write_then_read(register, 2)
+
+    def _write_then_read(self, register: int, length: int) -> list[int]:
+        """Writes the register pointer and reads the data with a repeated start in between, so no
+        other bus master can access the device between the two messages.
 
         Args:
-            i2c_addr: Address of the I2C device.
-            register: Register of the I2C device.
+            register: Register of the I2C device to start reading at.
+            length: Number of bytes to read.
 
         Returns:
-            One byte of data, None if port index does not exist.
+            A list with the data read from the device.
         """
-        return self.instance.read_byte_data(i2c_addr, register)
+        write = i2c_msg.write(self.i2c_addr, [register])
+        read = i2c_msg.read(self.i2c_addr, length)
+        self.instance.i2c_rdwr(write, read)
+        return list(read)
 
-    def _write_register_data(self, i2c_addr: int, register: int, value: int) -> None:
-        """Writes data to the device.
+    def _write_outputs(self, port_index: int, level: int) -> bool:
+        """Writes the output register of a port. If verify_writes is set, the port level is read
+        back in the same transfer, with a repeated start in between.
 
         Args:
-            i2c_addr: Address of the I2C device.
-            register: Register of the I2C device.
-            value: Value to write to the register.
+            port_index: Port index of the I2C device, must be valid.
+            level: Output level of the port.
+
+        Returns:
+            True if success else False.
         """
-        return self.instance.write_byte_data(i2c_addr, register, value)
+        if self.verify_writes:
+            write = i2c_msg.write(self.i2c_addr, [self._OUTPUT_REGS[port_index], level])
+            pointer = i2c_msg.write(self.i2c_addr, [self._INPUT_REGS[port_index]])
+            read = i2c_msg.read(self.i2c_addr, 1)
+            self.instance.i2c_rdwr(write, pointer, read)
+            data = list(read)[0]
+            self.pinstate[port_index] = data
+        else:
+            self._write_byte(self.i2c_addr, self._OUTPUT_REGS[port_index], level)
+            data = level
+
+        self._port_levels_cache = None
+
+        return data == level
+
+    def _write_register_pair(self, register: int, values: list[int]) -> None:
+        """Writes a register and the other register of its pair (port 0 and port 1) with a single
+        transaction.
+
+        Args:
+            register: Register of port 0.
+            values: Values to write to the registers of port 0 and port 1.
+        """
+        self.instance.write_i2c_block_data(self.i2c_addr, register, values)
 
     def _get_pin_output_level(self, port_level: int, pin_number: int) -> int:
         """Given the port level, returns the output level of a specific pin in the port.
@@ -907,65 +1069,147 @@ class Portexpander:
         Returns:
             The output level of a specific GPIO pin.
         """
-        mask = 1 << pin_number
-        return (port_level & mask) >> pin_number
+        return (port_level >> pin_number) & 1
 
-    def get_clamp_pin_levels(self, clamp_ids: Iterable[str] = ("15", "30")) -> list[Clamp]:
+    def _wait_for_clamps(self) -> None:
+        """Waits until the clamps have settled after the last change."""
+        delta = self._next_allowed - time.monotonic()
+        if delta > 0:
+            time.sleep(delta)
+
+    def get_clamp_pin_levels(
+        self, clamp_ids: Iterable[str] = ("15", "30"), force_refresh: bool = False
+    ) -> list[Clamp]:
         """Determines the output levels of the gpio pins associated with clamps and returns the
         results as a list of Clamp objects.
 
+        Notes:
+            Unless force_refresh is set, a reading of the port younger than _port_levels_ttl
+            is reused instead of accessing the bus.
+
         Args:
             clamp_ids: Iterable which contains the clamp ids/names.
+            force_refresh: Whether the external port must be read from the device.
 
         Returns:
             A list of Clamp objects.
         """
-        if not all(clamp_id in PortExpanderConfig.RELAYS for clamp_id in clamp_ids):
+        if not _relay_ids().issuperset(clamp_ids):
             raise USBConnectError(
                 f"The specified IDs ({clamp_ids}) are not supported. "
                 f"Please choose the following: "
-                f"{', '.join(PortExpanderConfig.RELAYS)}"
+                f"{_supported_relays_str()}"
             )
 
-        clamps = [Clamp(name=clamp_id) for clamp_id in clamp_ids]
-        if (gpio_port_level := self.get_gpio_port_level(PortExpanderConfig.EXTERNAL_PORT)) is None:
-            return clamps
+        self._wait_for_clamps()
 
-        for clamp in clamps:
-            pin_number = PortExpanderConfig.RELAYS[clamp.name]
-            pin_value = self._get_pin_output_level(gpio_port_level, pin_number)
-            clamp.state = "on" if pin_value else "off"
+        port_index = PortExpanderConfig.EXTERNAL_PORT
+        if force_refresh:
+            gpio_port_level = self.read_all_port_levels()[port_index]
+        elif (gpio_port_level := self.get_gpio_port_level(port_index)) is None:
+            return [Clamp(name=clamp_id) for clamp_id in clamp_ids]
 
-        return clamps
+        relay_masks = _relay_masks()
+        return [
+            Clamp(name=clamp_id, state=_STATE[bool(gpio_port_level & relay_masks[clamp_id])])
+            for clamp_id in clamp_ids
+        ]
 
-    @acquires_lock(lock=ResourceLock.TARGET_INTERACTION)
-    def set_clamp(self, clamp_id: str, action: Action, sleep_duration: int = 1) -> None:
+    def set_clamp(self, clamp_id: str, action: "Action | str", sleep_duration: float = 1) -> None:
         """Changes the status of the selected clamp/relay.
 
+        Notes:
+            The port expander only reflects the level driven on the pin, not the relay contacts,
+            so the settling of the clamp can't be observed and a fixed time is waited instead.
+            Pass a sleep_duration of 0 if no wait is needed.
+
+        Args:
+            clamp_id: Name of the clamp.
+            action: Whether the clamp should be turned on or off, either an Action or its value.
+            sleep_duration: Amount of time the clamp needs to settle after setting it. The next
+                clamp access waits until it has passed, instead of this call blocking for it.
+
+        Raises:
+            USBConnectError: If the specified clamp ID is not supported.
+        """
+        if not isinstance(action, Action):
+            action = Action(action)
+
+        self._set_clamp_fast(clamp_id, action, sleep_duration)
+
+    def _set_clamp_fast(self, clamp_id: str, action: Action, sleep_duration: float = 1) -> None:
+        """Version of set_clamp for internal callers that already pass an Action.
+
         Args:
             clamp_id: Name of the clamp.
             action: Whether the clamp should be turned on or off.
-            sleep_duration: Amount of time to wait after setting the clamp (useful when chaining
-                multiple calls).
+            sleep_duration: Amount of time the clamp needs to settle after setting it.
 
         Raises:
             USBConnectError: If the specified clamp ID is not supported.
         """
-        if clamp_id not in PortExpanderConfig.RELAYS:
+        if clamp_id not in _relay_ids():
             raise USBConnectError(
                 f"The specified ID ({clamp_id}) is not supported. "
                 f"Please choose one of the following: "
-                f"{', '.join(PortExpanderConfig.RELAYS)}"
+                f"{_supported_relays_str()}"
             )
 
-        if not isinstance(action, Action):
-            action = Action(action)
+        mask = _relay_masks()[clamp_id]
+        set_mask, clear_mask = (mask, 0) if action else (0, mask)
 
-        pin_number = PortExpanderConfig.RELAYS[clamp_id]
-        self.set_gpio_pin_output_level(
-            PortExpanderConfig.EXTERNAL_PORT, pin_number, 1 if action else 0
-        )
-        time.sleep(sleep_duration)
+        # wait without holding the lock, it only guards the write itself
+        self._wait_for_clamps()
+        self._update_external_port(set_mask, clear_mask)
+        self._next_allowed = time.monotonic() + sleep_duration
+
+    def set_clamps(self, actions: dict[str, Action], sleep_duration: float = 1) -> None:
+        """Changes the status of several clamps/relays with a single write to the external port.
+
+        Args:
+            actions: Whether the clamps should be turned on or off, by clamp id.
+            sleep_duration: Amount of time the clamps need to settle after setting them, see
+                set_clamp.
+
+        Raises:
+            USBConnectError: If one of the specified clamp IDs is not supported.
+        """
+        if not _relay_ids().issuperset(actions):
+            raise USBConnectError(
+                f"The specified IDs ({tuple(actions)}) are not supported. "
+                f"Please choose the following: "
+                f"{_supported_relays_str()}"
+            )
+
+        # fold all updates into the pins to set and clear, so the port is written once
+        relay_masks = _relay_masks()
+        set_mask = clear_mask = 0
+        for clamp_id, action in actions.items():
+            if not isinstance(action, Action):
+                action = Action(action)
+            if action:
+                set_mask |= relay_masks[clamp_id]
+            else:
+                clear_mask |= relay_masks[clamp_id]
+
+        # wait without holding the lock, it only guards the write itself
+        self._wait_for_clamps()
+        self._update_external_port(set_mask, clear_mask)
+        self._next_allowed = time.monotonic() + sleep_duration
+
+    @acquires_lock(lock=ResourceLock.TARGET_INTERACTION)
+    def _update_external_port(self, set_mask: int, clear_mask: int) -> None:
+        """Sets and clears pins of the external port with a single write. The output register is
+        read while holding the lock, so changes of other processes are kept.
+
+        Args:
+            set_mask: Mask byte of the pins to set.
+            clear_mask: Mask byte of the pins to clear.
+        """
+        port_index = PortExpanderConfig.EXTERNAL_PORT
+        level = self._read_port_outputs(port_index)
+
+        self.set_gpio_port_output_level(port_index, (level | set_mask) & ~clear_mask)
 
 class Switcher:
     """This class is a wrapper for the portexpander.
@@ -1004,19 +1248,17 @@ class UsbSwitcher:
 
     Attributes:
         log_enable: Flag to enable log messages.
-        switcher: Object for the port expander.
+        portexpander: Object for the port expander.
+        version: Standard of the USB switcher, read from the ID EEPROM on first use.
     """
 
     def __init__(self):
         self.log_enable = False
 
         try:
-            self.__switcher = Switcher()
+            self.__portexpander = Portexpander()
         except Exception:  # pylint: disable=broad-except
-            self.__switcher = None
-
-        with IdEeprom() as eep:
-            self.version = eep.manufacturer_data["usb_switcher_standard"]
+            self.__portexpander = None
 
     def __enter__(self) -> "Self":
         """Context Manager initialisation.
@@ -1035,15 +1277,32 @@ class UsbSwitcher:
         """Context Manager cleanup."""
 
     @property
-    def switcher(self) -> Switcher:
-        """Returns the Switcher instance.
+    def portexpander(self) -> Portexpander:
+        """Returns the Portexpander instance.
 
         Raises:
-            USBConnectError: If the Switcher instance is inactive.
+            USBConnectError: If the Portexpander instance is inactive.
         """
-        if not self.__switcher:
-            raise USBConnectError("The Switcher instance is unavailable.")
-        return self.__switcher
+        if not self.__portexpander:
+            raise USBConnectError("The Portexpander instance is unavailable.")
+        return self.__portexpander
+
+    @cached_property
+    def version(self) -> str:
+        """Returns the standard of the USB switcher stored on the ID EEPROM."""
+        with IdEeprom() as eep:
+            return eep.manufacturer_data["usb_switcher_standard"]
+
+    @cached_property
+    def _routes(self) -> "tuple[Callable[[], bool], Callable[[], bool]]":
+        """Returns the port expander methods routing the peripheral to the Raspberry Pi and to the
+        external USB connector. The level of the USB switch pin is inverted before standard 2.0.
+        """
+        portexpander = self.portexpander
+        if self.version != "2.0":
+            return portexpander.disable_usb_switch_pin, portexpander.enable_usb_switch_pin
+
+        return portexpander.enable_usb_switch_pin, portexpander.disable_usb_switch_pin
 
     # HARDWARE FUNCTIONS #
     def connect_peripheral_to_pi(self) -> bool:
@@ -1055,10 +1314,7 @@ class UsbSwitcher:
         """
         logger.info("Attach peripheral to Pi USB connection.")
 
-        if self.version != "2.0":
-            return self.switcher.instance.disable_usb_switch_pin()
-
-        return self.switcher.instance.enable_usb_switch_pin()
+        return self._routes[0]()
 
     def connect_peripheral_to_external(self) -> bool:
         """Set the portexpander pin state to select the routing of the peripheral to the
@@ -1069,35 +1325,39 @@ class UsbSwitcher:
         """
         logger.info("Attach peripheral to external USB connector")
 
-        if self.version != "2.0":
-            return self.switcher.instance.enable_usb_switch_pin()
-
-        return self.switcher.instance.disable_usb_switch_pin()
+        return self._routes[1]()
 
 
+@cache
 def usb_switcher_installed() -> bool:
     """Parses the device-tree directory and searches the content to see if the usb switcher
-    is installed.
+    is installed. The result is cached, as the device tree doesn't change while running.
 
     Returns:
         True if the usb switcher is installed, False otherwise.
     """
-    directory = Path("/proc/device-tree/hat/")
-    usb_string = "usb_switcher"
+    usb_string = b"usb_switcher"
 
-    if not directory.is_dir():
-        logger.error(f"Directory {directory} does not exist")
+    try:
+        entries = os.scandir(HAT_DIRECTORY)
+    except FileNotFoundError:
+        logger.error("Directory %s does not exist", HAT_DIRECTORY)
         return False
 
-    for file_path in directory.glob("*"):
-        if file_path.is_file():
+    with entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
             try:
-                contents = file_path.read_text(encoding="utf-8")
-                if usb_string in contents:
-                    logger.debug(f"Found in {file_path}")
-                    return True
-            except Exception as exception:
-                logger.error(f"Error reading file {file_path}: {exception}")
+                # compare the raw content, the entries don't need to be decoded for that
+                with open(entry.path, "rb") as file:
+                    contents = file.read()
+            except OSError as exception:
+                logger.error("Error reading file %s: %s", entry.path, exception)
+                continue
+            if usb_string in contents:
+                logger.debug("Found in %s", entry.path)
+                return True
     return False
 
 